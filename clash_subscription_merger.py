@@ -15,17 +15,37 @@ import sys
 import os
 import logging
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-# 添加当前目录到Python路径
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# 以脚本方式运行时脚本目录已是sys.path[0]，仅在被其他位置导入时才需要添加，
+# 避免重复条目让每次查找模块（包括进程池子进程中的导入）都多扫描一遍同一目录
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if _BASE_DIR not in sys.path:
+    sys.path.insert(0, _BASE_DIR)
 
-from modules.config_parser import ConfigParser
-from modules.http_downloader import HTTPDownloader
-from modules.yaml_processor import YAMLProcessor
-from modules.format_converter import FormatConverter
-from modules.config_generator import ConfigGenerator
+# 日志与预览输出使用的分隔线
+_BAR = "=" * 50
+
+# 功能模块会引入yaml、requests、aiohttp等较重的依赖，延迟到真正使用时再导入，
+# 使--help等命令无需加载它们
+
+
+def _extract_proxies_worker(file_path: Path) -> List[Dict[str, Any]]:
+    """
+    在子进程中解析单个订阅文件（定义在模块顶层以便进程池pickle）
+    
+    Args:
+        file_path: 订阅文件路径
+        
+    Returns:
+        List[Dict[str, Any]]: 代理配置列表
+    """
+    from modules.yaml_processor import YAMLProcessor
+    
+    return YAMLProcessor().extract_proxies(file_path)
 
 
 class ClashSubscriptionMerger:
@@ -47,6 +67,12 @@ class ClashSubscriptionMerger:
         self.download_dir = Path(download_dir)
         self.output_file = self.output_dir / "sub_by_opencode.yaml"
         
+        from modules.config_parser import ConfigParser
+        from modules.http_downloader import HTTPDownloader
+        from modules.yaml_processor import YAMLProcessor
+        from modules.format_converter import FormatConverter
+        from modules.config_generator import ConfigGenerator
+        
         # 初始化各个模块
         self.config_parser = ConfigParser(config_file)
         self.downloader = HTTPDownloader(download_dir)
@@ -58,16 +84,26 @@ class ClashSubscriptionMerger:
         self._setup_logging()
         
     def _setup_logging(self):
-        """设置日志记录"""
+        """设置日志记录（已配置过根日志器时不重复添加handler）"""
+        self.logger = logging.getLogger(__name__)
+        if logging.getLogger().handlers:
+            return
+            
+        handlers = [logging.StreamHandler(sys.stdout)]
+        log_error = None
+        try:
+            os.makedirs('logs', exist_ok=True)
+            handlers.append(logging.FileHandler('logs/clash_merger.log', encoding='utf-8'))
+        except OSError as e:
+            log_error = e
+            
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(sys.stdout),
-                logging.FileHandler('logs/clash_merger.log', encoding='utf-8')
-            ]
+            handlers=handlers
         )
-        self.logger = logging.getLogger(__name__)
+        if log_error:
+            self.logger.warning("无法创建日志文件，仅输出到控制台: %s", log_error)
         
     def run(self, dry_run: bool = False) -> bool:
         """
@@ -80,43 +116,49 @@ class ClashSubscriptionMerger:
             bool: 是否成功完成
         """
         try:
-            self.logger.info("=" * 50)
+            self.logger.info(_BAR)
             self.logger.info("Clash订阅合并工具启动")
-            self.logger.info("=" * 50)
+            self.logger.info(_BAR)
             
             # 步骤1：读取订阅配置
             self.logger.info("步骤1：读取订阅配置...")
             subscriptions = self.config_parser.parse_subscriptions()
-            self.logger.info(f"成功读取 {len(subscriptions)} 个订阅配置")
+            self.logger.info("成功读取 %d 个订阅配置", len(subscriptions))
             
             # 步骤2：下载订阅文件
             self.logger.info("步骤2：下载订阅文件...")
-            downloaded_files = []
-            for filename, url in subscriptions:
-                success = self.downloader.download_subscription(filename, url)
-                if success:
-                    downloaded_files.append(self.download_dir / filename)
-                    
+            downloaded_files = [
+                self.download_dir / filename
+                for filename in self.downloader.download_subscriptions(subscriptions)
+            ]
+            
             if not downloaded_files:
                 self.logger.error("没有可用的订阅文件")
                 return False
                 
             # 步骤3：解析YAML文件
             self.logger.info("步骤3：解析YAML文件...")
+            from modules.yaml_processor import YAML_BACKEND
+            self.logger.info("YAML解析后端: %s", YAML_BACKEND)
+            # 每个订阅解析完成后立即并入结果并去除重复节点，合并与其余文件的解析重叠进行
             all_proxies = []
-            for file_path in downloaded_files:
-                proxies = self.yaml_processor.extract_proxies(file_path)
+            seen = set()
+            total_count = 0
+            for file_path, proxies in zip(downloaded_files, self._iter_extracted_proxies(downloaded_files)):
                 if proxies:
-                    all_proxies.extend(proxies)
-                    self.logger.info(f"从 {file_path.name} 提取了 {len(proxies)} 个代理节点")
+                    total_count += len(proxies)
+                    self.yaml_processor.merge_unique_proxies(all_proxies, proxies, seen)
+                    self.logger.info("从 %s 提取了 %d 个代理节点", file_path.name, len(proxies))
                     
             if not all_proxies:
                 self.logger.error("没有提取到任何代理节点")
                 return False
                 
-            # 步骤4：格式转换为JSON格式（仅用于日志）
-            self.logger.info("步骤4：转换为JSON格式...")
-            json_proxy_count = len(self.format_converter.convert_proxies_to_json(all_proxies))
+            self.logger.info("节点去重: %d -> %d (移除 %d 个重复节点)",
+                             total_count, len(all_proxies), total_count - len(all_proxies))
+                
+            # 步骤4：格式转换为JSON格式（仅用于日志，节点在步骤3中已校验，数量与all_proxies一致）
+            self.logger.info("步骤4：转换为JSON格式... (%d 条)", len(all_proxies))
             
             # 步骤5：生成最终配置
             self.logger.info("步骤5：生成最终配置...")
@@ -130,33 +172,81 @@ class ClashSubscriptionMerger:
                     all_proxies, self.output_file
                 )
                 self.logger.info("预演模式：生成的配置预览")
-                print("=" * 50)
+                print(_BAR)
                 print(config_preview)
-                print("=" * 50)
+                print(_BAR)
             else:
                 # 正式模式，生成配置文件
                 success = self.config_generator.generate_config(
                     all_proxies, self.output_file
                 )
                 if success:
-                    self.logger.info(f"配置文件已生成: {self.output_file}")
-                    self.logger.info(f"文件大小: {self.output_file.stat().st_size} 字节")
+                    # 文件大小已由ConfigGenerator在写入后记录，这里不再重复stat
+                    self.logger.info("配置文件已生成: %s", self.output_file)
                 else:
                     self.logger.error("生成配置文件失败")
                     return False
                     
-            self.logger.info("=" * 50)
-            self.logger.info("任务完成！")
-            self.logger.info(f"总共处理了 {len(all_proxies)} 个代理节点")
-            self.logger.info(f"来自 {len(downloaded_files)} 个订阅源")
-            self.logger.info("=" * 50)
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(_BAR)
+                self.logger.info("任务完成！")
+                self.logger.info("总共处理了 %d 个代理节点", len(all_proxies))
+                self.logger.info("来自 %d 个订阅源", len(downloaded_files))
+                self.logger.info(_BAR)
             
             return True
             
         except Exception as e:
-            self.logger.error(f"执行过程中发生错误: {str(e)}")
+            self.logger.error("执行过程中发生错误: %s", e)
             return False
             
+    def _iter_extracted_proxies(self, downloaded_files: List[Path]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        逐个产出每个订阅文件的代理列表。已有解析缓存的文件在当前进程直接读取缓存，
+        只有需要完整解析的文件才交给进程池，全部命中缓存时不启动进程池
+        
+        Args:
+            downloaded_files: 订阅文件路径列表
+            
+        Yields:
+            List[Dict[str, Any]]: 单个文件的代理配置列表，顺序与输入一致
+        """
+        cached = [self.yaml_processor.has_parsed_cache(file_path) for file_path in downloaded_files]
+        parsed = self._iter_parsed_proxies(
+            [file_path for file_path, hit in zip(downloaded_files, cached) if not hit]
+        )
+        try:
+            for file_path, hit in zip(downloaded_files, cached):
+                yield self.yaml_processor.extract_proxies(file_path) if hit else next(parsed)
+        finally:
+            # 关闭生成器以退出进程池的with块
+            parsed.close()
+            
+    def _iter_parsed_proxies(self, files: List[Path]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        逐个产出需要完整解析的订阅文件的代理列表，多个文件时使用进程池并行解析
+        
+        Args:
+            files: 订阅文件路径列表
+            
+        Yields:
+            List[Dict[str, Any]]: 单个文件的代理配置列表，顺序与输入一致
+        """
+        done = 0
+        max_workers = min(len(files), os.cpu_count() or 1)
+        if max_workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    for proxies in executor.map(_extract_proxies_worker, files):
+                        done += 1
+                        yield proxies
+                return
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                self.logger.warning("无法启动多进程解析，改为串行处理: %s", e)
+                
+        for file_path in files[done:]:
+            yield self.yaml_processor.extract_proxies(file_path)
+            
     def cleanup(self):
         """清理临时文件"""
         self.downloader.cleanup()
@@ -195,10 +285,6 @@ def main():
     
     args = parser.parse_args()
     
-    # 设置日志级别
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
-    
     # 创建合并工具实例
     merger = ClashSubscriptionMerger(
         config_file=args.config,
@@ -206,6 +292,10 @@ def main():
         download_dir=args.download_dir
     )
     
+    # 设置日志级别（须在合并工具完成日志初始化之后，否则会被basicConfig覆盖）
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
     try:
         # 运行合并流程
         success = merger.run(dry_run=args.dry_run)
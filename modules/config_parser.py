@@ -9,10 +9,18 @@ import logging
 from pathlib import Path
 from typing import List, Tuple, Optional
 
+# 配置文件格式：文件名|订阅URL
+_CONFIG_RE = re.compile(r'^\s*([^|]+)\s*\|\s*(.+?)\s*$')
+# 订阅URL格式
+_URL_RE = re.compile(r'^https?://.+$')
+
 
 class ConfigParser:
     """订阅配置解析器"""
     
+    # 配置文件格式正则表达式（模块级预编译，所有实例共用）
+    config_pattern = _CONFIG_RE
+    
     def __init__(self, config_file: str):
         """
         初始化配置解析器
@@ -23,9 +31,6 @@ class ConfigParser:
         self.config_file = Path(config_file)
         self.logger = logging.getLogger(__name__)
         
-        # 配置文件格式正则表达式
-        self.config_pattern = re.compile(r'^\s*([^|]+)\s*\|\s*(.+?)\s*$')
-        
     def parse_subscriptions(self) -> List[Tuple[str, str]]:
         """
         解析订阅配置文件
@@ -44,36 +49,35 @@ class ConfigParser:
         
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                
-                # 跳过空行和注释行
-                if not line or line.startswith('#'):
-                    continue
+                # 逐行迭代文件，不再先用readlines()读出全部行
+                for line_num, line in enumerate(f, 1):
+                    line = line.strip()
                     
-                # 解析配置行
-                match = self.config_pattern.match(line)
-                if not match:
-                    self.logger.warning(f"第{line_num}行格式错误，跳过: {line}")
-                    continue
+                    # 跳过空行和注释行
+                    if not line or line.startswith('#'):
+                        continue
+                        
+                    # 解析配置行：按第一个|切分出文件名和URL，无需正则匹配
+                    filename, separator, url = line.partition('|')
+                    if not separator:
+                        self.logger.warning(f"第{line_num}行格式错误，跳过: {line}")
+                        continue
+                        
+                    filename = filename.strip()
+                    url = url.strip()
                     
-                filename = match.group(1).strip()
-                url = match.group(2).strip()
-                
-                # 验证文件名和URL
-                if not filename:
-                    self.logger.warning(f"第{line_num}行文件名为空，跳过: {line}")
-                    continue
-                    
-                if not url:
-                    self.logger.warning(f"第{line_num}行URL为空，跳过: {line}")
-                    continue
+                    # 验证文件名和URL
+                    if not filename:
+                        self.logger.warning(f"第{line_num}行文件名为空，跳过: {line}")
+                        continue
+                        
+                    if not url:
+                        self.logger.warning(f"第{line_num}行URL为空，跳过: {line}")
+                        continue
+                        
+                    subscriptions.append((filename, url))
+                    self.logger.debug(f"解析订阅: {filename} -> {url}")
                     
-                subscriptions.append((filename, url))
-                self.logger.debug(f"解析订阅: {filename} -> {url}")
-                
         except Exception as e:
             raise ValueError(f"读取配置文件时发生错误: {str(e)}")
             
@@ -99,8 +103,7 @@ class ConfigParser:
             self.logger.warning(f"文件名格式可能不正确: {filename}")
             
         # 检查URL格式
-        url_pattern = re.compile(r'^https?://.+$')
-        if not url_pattern.match(url):
+        if not _URL_RE.match(url):
             self.logger.warning(f"URL格式可能不正确: {url}")
             return False
             
@@ -156,14 +159,21 @@ class ConfigParser:
             excluded_count = sum(1 for filename, _ in subscriptions if filename in excluded)
             active_count = total_count - excluded_count
             
+            # 一次stat同时得到是否存在和文件大小
+            try:
+                st = os.stat(self.config_file)
+                exists, size = True, st.st_size
+            except FileNotFoundError:
+                exists, size = False, 0
+            
             return {
                 'total_subscriptions': total_count,
                 'excluded_subscriptions': excluded_count,
                 'active_subscriptions': active_count,
                 'excluded_list': excluded,
                 'config_file': str(self.config_file),
-                'file_exists': self.config_file.exists(),
-                'file_size': self.config_file.stat().st_size if self.config_file.exists() else 0
+                'file_exists': exists,
+                'file_size': size
             }
             
         except Exception as e:
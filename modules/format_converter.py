@@ -6,9 +6,69 @@
 import json
 import re
 import logging
+import yaml
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+# 与订阅解析共用同一个Loader（libyaml C实现、不解析时间戳），两条路径得到相同的代理字典
+from .yaml_processor import _FastLoader
+
+# orjson为可选依赖（原生实现，序列化更快），未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 多行YAML中代理条目的name字段
+_NAME_RE = re.compile(r'name:\s*["\']?([^"\'\s,]+)["\']?')
+# proxies部分的起始行
+_PROXIES_KEY_RE = re.compile(r'^[^\S\n]*proxies:.*$', re.M)
+# proxies部分之后的第一个顶级键（不以空白开头的非注释行；顶级的proxies:不算）
+_TOP_LEVEL_RE = re.compile(r'^(?![ \t])(?![^\S\n]*proxies:)(?=[^\S\n]*[^\s#])', re.M)
+# proxies部分中的一行：以-开头的新代理（分组1），或 键: 值 形式的属性（分组2、3）
+_PROXY_LINE_RE = re.compile(r'^[^\S\n]*(?:(-.*?)|(.*?)[^\S\n]*:[^\S\n]*(.*?))[^\S\n]*$', re.M)
+
+
+# url-test / fallback代理组的测试地址
+GSTATIC_204 = 'http://www.gstatic.com/generate_204'
+
+# 生成的代理组：(组名, 类型, 排在节点前面的固定成员, 测试URL, 测试间隔)，
+# 所有节点名称追加在固定成员之后
+PROXY_GROUP_SPECS = (
+    ('手动选择', 'select', ('自动选择', '故障转移'), None, None),
+    ('自动选择', 'url-test', (), GSTATIC_204, 86400),
+    ('故障转移', 'fallback', (), GSTATIC_204, 7200),
+)
+
+def dumps_compact(obj: Any) -> str:
+    """
+    将对象序列化为紧凑的单行JSON字符串（不转义非ASCII字符）
+    
+    Args:
+        obj: 待序列化的对象
+        
+    Returns:
+        str: JSON字符串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps_compact_bytes(obj: Any) -> bytes:
+    """
+    将对象序列化为紧凑的单行JSON（UTF-8字节），orjson可直接输出字节，省去解码再编码
+    
+    Args:
+        obj: 待序列化的对象
+        
+    Returns:
+        bytes: UTF-8编码的JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
 
 class FormatConverter:
     """格式转换器"""
@@ -27,23 +87,29 @@ class FormatConverter:
         Returns:
             List[str]: JSON格式的代理配置字符串列表
         """
-        json_proxies = []
+        # 先筛掉缺少必要字段的代理，再整批序列化（列表推导式没有逐项的异常处理开销）
+        valid_proxies = []
         for proxy in proxies:
             try:
-                # 确保代理配置有name和type字段
                 if 'name' not in proxy or 'type' not in proxy:
                     self.logger.warning(f"代理配置缺少必要字段，跳过: {proxy.get('name', 'Unknown')}")
                     continue
-                    
-                # 转换为JSON字符串
-                proxy_json = json.dumps(proxy, ensure_ascii=False, separators=(',', ':'))
-                json_proxy = f'  - {proxy_json}'
-                json_proxies.append(json_proxy)
-                
             except Exception as e:
                 self.logger.warning(f"转换代理配置为JSON失败: {str(e)}")
                 continue
-                
+            valid_proxies.append(proxy)
+            
+        try:
+            json_proxies = [f'  - {dumps_compact(proxy)}' for proxy in valid_proxies]
+        except Exception:
+            # 存在无法序列化的代理时逐个处理，跳过出错的代理
+            json_proxies = []
+            for proxy in valid_proxies:
+                try:
+                    json_proxies.append(f'  - {dumps_compact(proxy)}')
+                except Exception as e:
+                    self.logger.warning(f"转换代理配置为JSON失败: {str(e)}")
+                    
         self.logger.info(f"成功转换 {len(json_proxies)} 个代理为JSON格式")
         return json_proxies
         
@@ -57,44 +123,14 @@ class FormatConverter:
         Returns:
             List[str]: JSON格式的proxy-groups配置字符串列表
         """
-        json_groups = []
-        
-        # 构建代理名称的JSON格式列表
-        proxies_json_list = []
-        for name in proxy_names:
-            # 处理特殊字符和引号
-            escaped_name = json.dumps(name, ensure_ascii=False)
-            proxies_json_list.append(escaped_name)
-            
-        proxies_content = ', '.join(proxies_json_list)
-        
-        # 手动选择组
-        manual_select = self._create_proxy_group_json(
-            '手动选择', 
-            'select', 
-            ['自动选择', '故障转移'] + proxy_names
-        )
-        json_groups.append(manual_select)
-        
-        # 自动选择组
-        auto_select = self._create_proxy_group_json(
-            '自动选择',
-            'url-test',
-            proxy_names,
-            url='http://www.gstatic.com/generate_204',
-            interval=86400
-        )
-        json_groups.append(auto_select)
-        
-        # 故障转移组
-        fallback = self._create_proxy_group_json(
-            '故障转移',
-            'fallback',
-            proxy_names,
-            url='http://www.gstatic.com/generate_204',
-            interval=7200
-        )
-        json_groups.append(fallback)
+        # 各组直接引用同一个proxy_names列表，只有带固定成员的组才拼接新列表
+        json_groups = [
+            self._create_proxy_group_json(
+                name, group_type, [*members, *proxy_names] if members else proxy_names,
+                url=url, interval=interval
+            )
+            for name, group_type, members, url, interval in PROXY_GROUP_SPECS
+        ]
         
         self.logger.info(f"生成了 {len(json_groups)} 个代理组配置")
         return json_groups
@@ -114,19 +150,11 @@ class FormatConverter:
         Returns:
             str: JSON格式的代理组配置字符串
         """
-        # 构建代理名称列表
-        proxies_list = []
-        for proxy_name in proxies:
-            escaped_name = json.dumps(proxy_name, ensure_ascii=False)
-            proxies_list.append(escaped_name)
-            
-        proxies_content = ', '.join(proxies_list)
-        
-        # 构建JSON对象
+        # 构建JSON对象（名称中的特殊字符和引号由整体序列化统一转义）
         group_data = {
             'name': name,
             'type': group_type,
-            'proxies': proxies_list
+            'proxies': proxies
         }
         
         # 添加url-test或fallback特定字段
@@ -135,8 +163,8 @@ class FormatConverter:
         if interval:
             group_data['interval'] = interval
             
-        # 转换为JSON字符串
-        group_json = json.dumps(group_data, ensure_ascii=False, separators=(', ', ': '))
+        # 转换为紧凑格式的JSON字符串，与ConfigGenerator输出的代理组行格式一致
+        group_json = dumps_compact(group_data)
         return f'  - {group_json}'
         
     def extract_proxies_from_multiline(self, content: str) -> List[Dict[str, Any]]:
@@ -149,54 +177,55 @@ class FormatConverter:
         Returns:
             List[Dict[str, Any]]: 代理配置列表
         """
-        proxies = []
+        # 优先交给YAML解析器（与YAMLProcessor相同的Loader）完整解析
+        try:
+            data = yaml.load(content, Loader=_FastLoader)
+        except yaml.YAMLError as e:
+            self.logger.debug(f"YAML解析失败，改为逐行提取代理配置: {str(e)}")
+        else:
+            if isinstance(data, dict):
+                proxies = data.get('proxies') or []
+                if isinstance(proxies, list):
+                    return [proxy for proxy in proxies if isinstance(proxy, dict)]
+                    
+        # 内容不是合法YAML（或结构不符）时，按行容错提取
+        return self._extract_proxies_by_lines(content)
         
-        # 查找proxies部分
-        lines = content.split('\n')
-        in_proxies = False
-        current_proxy = {}
-        current_indent = 0
+    def _extract_proxies_by_lines(self, content: str) -> List[Dict[str, Any]]:
+        """
+        按行从YAML内容中容错提取代理配置（各属性值保留为字符串）
         
-        for line in lines:
-            stripped = line.strip()
+        Args:
+            content: YAML文件内容
             
-            # 检测proxies部分开始
-            if stripped.startswith('proxies:'):
-                in_proxies = True
-                current_indent = len(line) - len(line.lstrip())
-                continue
-                
-            # 检测其他顶级部分开始
-            if in_proxies and stripped and not line.startswith(' ') and not line.startswith('\t'):
-                if not stripped.startswith('#'):
-                    break
+        Returns:
+            List[Dict[str, Any]]: 代理配置列表
+        """
+        proxies = []
+        
+        # 查找proxies部分，并用正则定位其结束位置，只在这个区间内扫描
+        start_match = _PROXIES_KEY_RE.search(content)
+        if not start_match:
+            return proxies
+        start = start_match.end()
+        end_match = _TOP_LEVEL_RE.search(content, start)
+        end = end_match.start() if end_match else len(content)
+        
+        current_proxy = None
+        for item, key, value in _PROXY_LINE_RE.findall(content, start, end):
+            # 检测新代理开始
+            if item:
+                current_proxy = {'name': '', 'type': '', 'server': '', 'port': 0}
+                proxies.append(current_proxy)
+                # 提取name
+                name_match = _NAME_RE.search(item)
+                if name_match:
+                    current_proxy['name'] = name_match.group(1)
                     
-            # 在proxies部分中
-            if in_proxies:
-                # 检测新代理开始
-                if stripped.startswith('-'):
-                    # 保存前一个代理
-                    if current_proxy:
-                        proxies.append(current_proxy)
-                        
-                    current_proxy = {'name': '', 'type': '', 'server': '', 'port': 0}
-                    # 提取name
-                    name_match = re.search(r'name:\s*["\']?([^"\'\s,]+)["\']?', stripped)
-                    if name_match:
-                        current_proxy['name'] = name_match.group(1)
-                        
-                # 处理多行属性
-                elif current_proxy and ':' in stripped:
-                    parts = stripped.split(':', 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        value = parts[1].strip()
-                        current_proxy[key] = value
-                        
-        # 保存最后一个代理
-        if current_proxy:
-            proxies.append(current_proxy)
-            
+            # 处理多行属性（重复出现的proxies:行不是属性）
+            elif current_proxy is not None and key != 'proxies':
+                current_proxy[key] = value
+                
         return proxies
         
     def format_proxy_to_json_line(self, proxy: Dict[str, Any]) -> str:
@@ -209,21 +238,8 @@ class FormatConverter:
         Returns:
             str: JSON格式的代理配置字符串
         """
-        # 确保所有值都是正确的类型
-        formatted_proxy = {}
-        for key, value in proxy.items():
-            if isinstance(value, bool):
-                formatted_proxy[key] = value
-            elif isinstance(value, (int, float)):
-                formatted_proxy[key] = value
-            elif isinstance(value, str):
-                formatted_proxy[key] = value
-            else:
-                # 其他复杂类型保持原样
-                formatted_proxy[key] = value
-                
-        proxy_json = json.dumps(formatted_proxy, ensure_ascii=False, separators=(',', ':'))
-        return f'  - {proxy_json}'
+        # 直接序列化原字典（各类型的值都原样输出，无需逐项复制）
+        return f'  - {dumps_compact(proxy)}'
         
     def convert_to_compact_yaml(self, proxies: List[Dict[str, Any]]) -> str:
         """
@@ -235,9 +251,8 @@ class FormatConverter:
         Returns:
             str: 紧凑格式的YAML字符串
         """
-        lines = ['proxies:']
-        for proxy in proxies:
-            line = self.format_proxy_to_json_line(proxy)
-            lines.append(line)
+        if not proxies:
+            return 'proxies:'
             
-        return '\n'.join(lines)
\ No newline at end of file
+        # 只做一次拼接，行前缀作为分隔符写入，不再为每个代理单独生成带前缀的行
+        return 'proxies:\n  - ' + '\n  - '.join([dumps_compact(proxy) for proxy in proxies])
\ No newline at end of file
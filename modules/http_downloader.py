@@ -3,20 +3,422 @@ HTTP下载器模块
 负责从订阅URL下载配置文件到指定目录
 """
 
+import io
 import os
+import json
+import mmap
+import base64
 import time
+import asyncio
+import hashlib
+import secrets
 import logging
+import threading
+import yaml
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
-from urllib.parse import urlparse
+from typing import Optional, Dict, Any, List, Mapping, Tuple
+from urllib.parse import urlparse, unquote, parse_qsl
+
+from .yaml_processor import looks_like_base64
+
+# 优先使用基于libyaml的C输出器，未编译libyaml时回退到纯Python实现
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+# aiohttp为可选依赖，安装后可并发下载所有订阅
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 安装了brotli（或brotlicffi）时才声明支持br压缩，requests/urllib3与aiohttp都依赖它解码
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+# 以这些顶级键开头的订阅即普通Clash YAML配置，无需Base64/URI处理
+# （不含注释行：URI列表也可能以注释开头）
+_PLAIN_YAML_PREFIXES = (b'mixed-port:', b'port:', b'proxies:', b'proxy-providers:')
+
+# URI订阅转换为YAML时使用的基础配置（proxies之前的部分）
+_URI_BASE_CONFIG = {
+    'mixed-port': 7890,
+    'allow-lan': True,
+    'bind-address': '*',
+    'mode': 'rule',
+    'log-level': 'info',
+    'external-controller': '127.0.0.1:9090',
+    'dns': {
+        'enable': False,
+        'ipv6': False,
+        'default-nameserver': ['223.5.5.5', '119.29.29.29'],
+        'enhanced-mode': 'fake-ip',
+        'fake-ip-range': '198.18.0.1/16',
+        'use-hosts': True,
+        'nameserver': ['https://doh.pub/dns-query', 'https://dns.alidns.com/dns-query'],
+        'fallback': ['https://doh.dns.sb/dns-query', 'https://dns.cloudflare.com/dns-query',
+                     'https://dns.twnic.tw/dns-query', 'tls://8.8.4.4:853'],
+        'fallback-filter': {'geoip': True, 'ipcidr': ['240.0.0.0/4', '0.0.0.0/32']},
+    },
+}
+
+
+@lru_cache(maxsize=1024)
+def _parse_url(url: str):
+    """
+    解析URL并缓存结果，同一URL重复校验时不再重新解析
+    
+    Args:
+        url: 待解析的URL
+        
+    Returns:
+        ParseResult: urlparse的解析结果
+    """
+    return urlparse(url)
+
+
+async def _to_thread(func, *args):
+    """
+    在线程池中执行同步函数，避免阻塞事件循环（Python 3.9以下没有asyncio.to_thread）
+    
+    Args:
+        func: 同步函数
+        *args: 函数参数
+        
+    Returns:
+        函数的返回值
+    """
+    if hasattr(asyncio, 'to_thread'):
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _parse_vmess(rest: str, proxy_name: str) -> Optional[Dict[str, Any]]:
+    """
+    解析vmess://后的Base64 JSON配置
+    
+    Args:
+        rest: 去掉协议前缀和#名称后的URI内容
+        proxy_name: 节点名称
+        
+    Returns:
+        Dict[str, Any]: 代理配置
+    """
+    vmess_config = json.loads(base64.b64decode(rest).decode('utf-8'))
+    
+    proxy = {
+        'name': proxy_name,
+        'type': 'vmess',
+        'server': vmess_config.get('add', vmess_config.get('address', '')),
+        'port': int(vmess_config.get('port', 443)),
+        'uuid': vmess_config.get('id', ''),
+        'alterId': vmess_config.get('aid', 0),
+        'cipher': vmess_config.get('scy', 'auto'),
+        'network': vmess_config.get('net', 'tcp'),
+    }
+    
+    if vmess_config.get('tls') == 'tls':
+        proxy['tls'] = True
+    if vmess_config.get('sni'):
+        proxy['sni'] = vmess_config.get('sni')
+    return proxy
+
+
+def _split_uri_endpoint(rest: str) -> Optional[Tuple[Optional[str], str, str, Dict[str, str]]]:
+    """
+    拆分 userinfo@server:port?query 形式的URI内容
+    
+    Args:
+        rest: 去掉协议前缀和#名称后的URI内容
+        
+    Returns:
+        Tuple: (认证信息, 服务器, 端口, 查询参数)，缺少端口时返回None
+    """
+    # 解析服务器和端口
+    if '@' in rest:
+        userinfo, server_part = rest.split('@', 1)
+    else:
+        userinfo = None
+        server_part = rest
+    
+    if '?' in server_part:
+        server_addr, query = server_part.split('?', 1)
+    else:
+        server_addr = server_part
+        query = ''
+    
+    # 清理server_addr末尾的斜杠（处理 /? 的情况）
+    server_addr = server_addr.rstrip('/')
+    
+    if ':' not in server_addr:
+        return None
+    server, port = server_addr.rsplit(':', 1)
+    
+    # 解析参数（parse_qsl负责解码%xx，重复的键以最后一个为准）。分享链接按RFC 3986编码，
+    # +是字面字符而不是空格，先转义为%2B，避免path、password等参数中的+被表单解码成空格。
+    # 没有=的裸参数（如?udp、?insecure）忽略，不能当作空值处理成False覆盖默认值
+    query = '&'.join(param for param in query.split('&') if '=' in param)
+    params = dict(parse_qsl(query.replace('+', '%2B'), keep_blank_values=True))
+    
+    return userinfo, server, port, params
+
+
+def _apply_uri_params(proxy: Dict[str, Any], params: Dict[str, str]):
+    """
+    把各协议通用的查询参数（TLS、传输方式、WebSocket、Reality等）写入代理配置
+    
+    Args:
+        proxy: 代理配置（原地修改）
+        params: URI查询参数
+    """
+    if 'sni' in params:
+        proxy['sni'] = params['sni']
+    if 'servername' in params:
+        proxy['servername'] = params['servername']
+    if 'skip-cert-verify' in params:
+        proxy['skip-cert-verify'] = params['skip-cert-verify'] == '1'
+    if 'allowinsecure' in params:
+        proxy['skip-cert-verify'] = params['allowinsecure'] == '1'
+    if 'allowInsecure' in params:
+        proxy['skip-cert-verify'] = params['allowInsecure'] == '1'
+    if 'insecure' in params:
+        proxy['skip-cert-verify'] = params['insecure'] == '1'
+    if 'udp' in params:
+        proxy['udp'] = params['udp'] == '1'
+    if 'type' in params:
+        proxy['network'] = params['type']
+    
+    # TLS/Reality启用 (支持多种参数名)
+    if params.get('tls') == '1' or params.get('security') == 'tls':
+        proxy['tls'] = True
+    
+    # flow参数（支持flow=xxx格式）
+    if 'flow' in params:
+        proxy['flow'] = params['flow']
+    
+    # encryption参数
+    if 'encryption' in params:
+        proxy['cipher'] = params['encryption']
+    
+    # client-fingerprint参数
+    if 'fp' in params:
+        proxy['client-fingerprint'] = params['fp']
+    elif 'client-fingerprint' in params:
+        proxy['client-fingerprint'] = params['client-fingerprint']
+    
+    # WebSocket相关参数
+    if 'path' in params:
+        ws_opts = {'path': params['path']}
+        if 'host' in params:
+            ws_opts['headers'] = {'Host': params['host']}
+        # early-data相关参数
+        if 'ed' in params:
+            ws_opts['max-early-data'] = int(params['ed'])
+        if 'ecdh' in params:
+            ws_opts['early-data-header-name'] = params['ecdh']
+        proxy['ws-opts'] = ws_opts
+    
+    # Reality相关参数
+    if 'pbk' in params:
+        reality_opts = {'public-key': params['pbk']}
+        if 'sid' in params:
+            reality_opts['short-id'] = params['sid']
+        proxy['reality-opts'] = reality_opts
+
+
+def _parse_trojan(rest: str, proxy_name: str) -> Optional[Dict[str, Any]]:
+    """
+    解析trojan://后的内容，userinfo整体即密码
+    
+    Args:
+        rest: 去掉协议前缀和#名称后的URI内容
+        proxy_name: 节点名称
+        
+    Returns:
+        Dict[str, Any]: 代理配置，缺少端口时返回None
+    """
+    endpoint = _split_uri_endpoint(rest)
+    if endpoint is None:
+        return None
+    userinfo, server, port, params = endpoint
+    
+    proxy = {'name': proxy_name, 'type': 'trojan', 'server': server, 'port': int(port)}
+    if userinfo:
+        proxy['password'] = userinfo
+    _apply_uri_params(proxy, params)
+    return proxy
+
+
+def _parse_ss(rest: str, proxy_name: str) -> Optional[Dict[str, Any]]:
+    """
+    解析ss://后的内容，userinfo格式为 加密方式:密码
+    
+    Args:
+        rest: 去掉协议前缀和#名称后的URI内容
+        proxy_name: 节点名称
+        
+    Returns:
+        Dict[str, Any]: 代理配置，缺少端口时返回None
+    """
+    endpoint = _split_uri_endpoint(rest)
+    if endpoint is None:
+        return None
+    userinfo, server, port, params = endpoint
+    
+    proxy = {'name': proxy_name, 'type': 'ss', 'server': server, 'port': int(port)}
+    if userinfo and ':' in userinfo:
+        method, _, password = userinfo.rpartition(':')
+        proxy['method'] = method
+        proxy['password'] = password
+    _apply_uri_params(proxy, params)
+    return proxy
+
+
+def _parse_vless(rest: str, proxy_name: str) -> Optional[Dict[str, Any]]:
+    """
+    解析vless://后的内容，userinfo格式为 UUID 或 UUID:flow
+    
+    Args:
+        rest: 去掉协议前缀和#名称后的URI内容
+        proxy_name: 节点名称
+        
+    Returns:
+        Dict[str, Any]: 代理配置，缺少端口时返回None
+    """
+    endpoint = _split_uri_endpoint(rest)
+    if endpoint is None:
+        return None
+    userinfo, server, port, params = endpoint
+    
+    proxy = {'name': proxy_name, 'type': 'vless', 'server': server, 'port': int(port)}
+    if userinfo:
+        uuid, _, flow = userinfo.partition(':')
+        proxy['uuid'] = uuid
+        if flow:
+            proxy['flow'] = flow
+            
+    # vless协议添加alterId和cipher默认值
+    proxy['alterId'] = 0
+    proxy['cipher'] = 'auto'
+    _apply_uri_params(proxy, params)
+    return proxy
+
+
+def _parse_hysteria2(rest: str, proxy_name: str) -> Optional[Dict[str, Any]]:
+    """
+    解析hysteria2://后的内容
+    
+    Args:
+        rest: 去掉协议前缀和#名称后的URI内容
+        proxy_name: 节点名称
+        
+    Returns:
+        Dict[str, Any]: 代理配置，缺少端口时返回None
+    """
+    endpoint = _split_uri_endpoint(rest)
+    if endpoint is None:
+        return None
+    _, server, port, params = endpoint
+    
+    proxy = {'name': proxy_name, 'type': 'hysteria2', 'server': server, 'port': int(port)}
+    _apply_uri_params(proxy, params)
+    
+    # hysteria2特殊参数
+    if 'mport' in params:
+        proxy['mport'] = params['mport']
+    if 'ports' in params:
+        proxy['ports'] = params['ports']
+    # hysteria2默认开启udp
+    if 'udp' not in proxy:
+        proxy['udp'] = True
+    return proxy
+
+
+# URI协议名 -> 解析函数
+_SCHEME_PARSERS = {
+    'trojan': _parse_trojan,
+    'ss': _parse_ss,
+    'vless': _parse_vless,
+    'vmess': _parse_vmess,
+    'hysteria2': _parse_hysteria2,
+}
+
+
+def _check_payload_head(content: str) -> bool:
+    """
+    根据内容开头判断是否为有效的Clash YAML配置
+    
+    Args:
+        content: 内容开头（约1024字符）
+        
+    Returns:
+        bool: 内容是否有效
+    """
+    logger = logging.getLogger(__name__)
+    if not content:
+        logger.error("下载的文件为空")
+        return False
+        
+    # 检查是否包含YAML关键字
+    yaml_keywords = ['proxies:', 'proxy-groups:', 'rules:', 'mixed-port:', 'mode:']
+    if not any(keyword in content for keyword in yaml_keywords):
+        logger.error("文件内容不是有效的YAML格式")
+        return False
+        
+    return True
+
+
+def _write_atomic(target: Path, data: bytes):
+    """
+    原子地写入文件：先写入同目录下的临时文件并fsync，再用os.replace替换目标文件，
+    中途崩溃不会留下写了一半的目标文件
+    
+    Args:
+        target: 目标文件路径
+        data: 文件内容
+    """
+    temp_path = target.parent / f".{target.name}.{secrets.token_hex(4)}.tmp"
+    # 以0666创建、由内核应用umask，权限与普通open()创建的文件一致（mkstemp固定为0600）
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, target)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
 
 
 class HTTPDownloader:
-    """HTTP文件下载器"""
+    """
+    HTTP文件下载器
+    
+    所有下载共用同一个会话（requests.Session / aiohttp.ClientSession），
+    keep-alive连接只有在会话复用时才会被复用，因此不要为每次下载单独创建会话
+    """
+    
+    # 重试策略（同步与异步下载共用）
+    RETRY_TOTAL = 3
+    RETRY_BACKOFF_FACTOR = 1
+    RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+    # 订阅内容处理（Base64解码、URI转换）的版本：修改处理逻辑后须递增，
+    # 使已转换的文件在上游内容未变化（304或哈希相同）时也重新处理
+    PROCESS_VERSION = 2
     
     def __init__(self, download_dir: str = "sub-yamls", timeout: int = 30):
         """
@@ -33,20 +435,138 @@ class HTTPDownloader:
         # 创建下载目录
         self.download_dir.mkdir(exist_ok=True)
         
-        # 设置HTTP请求头，模拟浏览器
+        # 设置HTTP请求头：只保留订阅服务端会用到的字段（keep-alive由连接池默认处理）
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'application/x-yaml, application/yaml, text/yaml, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
+            'Accept-Encoding': ACCEPT_ENCODING,
         }
         
         # 创建临时文件目录
         self.temp_dir = Path(tempfile.gettempdir()) / "clash_merger"
         self.temp_dir.mkdir(exist_ok=True)
         
+        # 下载缓存：文件名 -> {url, etag, last_modified, sha256, mtime, version}，用于条件请求
+        self.cache_file = self.download_dir / ".cache.json"
+        self._cache = self._load_cache()
+        # 并发下载时多个线程会同时更新并保存缓存
+        self._cache_lock = threading.Lock()
+        
+        # 所有下载共用一个会话，复用keep-alive连接，避免每个文件重新握手
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        retry_strategy = Retry(
+            total=self.RETRY_TOTAL,
+            backoff_factor=self.RETRY_BACKOFF_FACTOR,
+            status_forcelist=list(self.RETRY_STATUS_FORCELIST),
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry_strategy)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+    def download_subscriptions(self, subscriptions: List[Tuple[str, str]]) -> List[str]:
+        """
+        下载全部订阅文件，安装了aiohttp时并发下载，否则逐个同步下载
+        
+        Args:
+            subscriptions: 订阅配置列表，格式为[(文件名, URL), ...]
+            
+        Returns:
+            List[str]: 下载成功的文件名列表，顺序与输入一致
+        """
+        if aiohttp is not None and len(subscriptions) > 1:
+            results = asyncio.run(self.download_many(subscriptions))
+        else:
+            results = [self.download_subscription(filename, url) for filename, url in subscriptions]
+            
+        return [filename for (filename, _), success in zip(subscriptions, results) if success]
+        
+    async def download_many(self, subscriptions: List[Tuple[str, str]]) -> List[bool]:
+        """
+        使用同一个aiohttp会话并发下载所有订阅，复用连接池与DNS缓存，
+        下载后的解码与解析放到线程中执行，不阻塞其余下载
+        
+        Args:
+            subscriptions: 订阅配置列表
+            
+        Returns:
+            List[bool]: 每个订阅是否下载成功
+        """
+        connector = aiohttp.TCPConnector(limit=64, ttl_dns_cache=300)
+        # 与requests的timeout一致：分别限制连接和每次读取，不限制整个响应体的传输时间
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout)
+        # trust_env：与requests一致，读取HTTP_PROXY/HTTPS_PROXY/NO_PROXY等环境变量
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                         timeout=timeout, trust_env=True) as session:
+            return await asyncio.gather(
+                *[self._fetch_one(session, filename, url) for filename, url in subscriptions]
+            )
+            
+    async def _fetch_one(self, session: "aiohttp.ClientSession", filename: str, url: str) -> bool:
+        """
+        异步下载单个订阅文件，响应体分块写入临时文件后在线程中交由同步流程处理
+        
+        Args:
+            session: aiohttp会话
+            filename: 保存的文件名
+            url: 订阅URL
+            
+        Returns:
+            bool: 下载是否成功
+        """
+        try:
+            self.logger.info(f"开始下载订阅: {filename} from {url}")
+            
+            # 验证URL格式
+            if not self._validate_url(url):
+                self.logger.error(f"无效的URL: {url}")
+                return False
+                
+            temp_file = self.temp_dir / f"{filename}.tmp"
+            headers = self._conditional_headers(filename, url)
+            for attempt in range(self.RETRY_TOTAL + 1):
+                try:
+                    async with session.get(url, headers=headers, allow_redirects=True) as response:
+                        if response.status == 304:
+                            return self._use_cached_file(filename)
+                        if (response.status in self.RETRY_STATUS_FORCELIST
+                                and attempt < self.RETRY_TOTAL):
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history,
+                                status=response.status, message=response.reason or ''
+                            )
+                        response.raise_for_status()
+                        
+                        digest = hashlib.sha256()
+                        with open(temp_file, 'wb') as f:
+                            async for chunk in response.content.iter_chunked(65536):
+                                f.write(chunk)
+                                digest.update(chunk)
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    retryable = (not isinstance(e, aiohttp.ClientResponseError)
+                                 or e.status in self.RETRY_STATUS_FORCELIST)
+                    if not retryable or attempt >= self.RETRY_TOTAL:
+                        raise
+                    delay = self.RETRY_BACKOFF_FACTOR * (2 ** attempt)
+                    self.logger.debug(f"请求失败，{delay} 秒后重试: {url} - {str(e)}")
+                    await asyncio.sleep(delay)
+                    
+            # Base64解码、URI解析等CPU密集的处理放到线程中，事件循环继续服务其余下载
+            return await _to_thread(self._finish_download, filename, url, temp_file,
+                                    digest.hexdigest(), response.headers)
+            
+        except asyncio.TimeoutError:
+            self.logger.error(f"请求超时: {url}")
+        except aiohttp.ClientResponseError as e:
+            self.logger.error(f"HTTP错误 {e.status}: {url}")
+        except aiohttp.ClientError as e:
+            self.logger.error(f"请求异常: {url} - {str(e)}")
+        except Exception as e:
+            self.logger.error(f"下载订阅时发生错误 {filename}: {str(e)}")
+            
+        return False
+        
     def download_subscription(self, filename: str, url: str) -> bool:
         """
         下载订阅文件
@@ -58,8 +578,6 @@ class HTTPDownloader:
         Returns:
             bool: 下载是否成功
         """
-        output_file = self.download_dir / filename
-        
         try:
             self.logger.info(f"开始下载订阅: {filename} from {url}")
             
@@ -68,46 +586,191 @@ class HTTPDownloader:
                 self.logger.error(f"无效的URL: {url}")
                 return False
                 
-            # 发送HTTP请求
-            response = self._make_request(url)
+            # 发送HTTP请求（本地已有缓存时带上条件请求头）
+            response = self._make_request(url, self._conditional_headers(filename, url))
             if not response:
                 return False
                 
-            # 保存到临时文件
+            if response.status_code == 304:
+                response.close()
+                return self._use_cached_file(filename)
+                
+            # 流式写入临时文件，不在内存中保留完整响应体，同时计算内容哈希
             temp_file = self.temp_dir / f"{filename}.tmp"
-            with open(temp_file, 'wb') as f:
-                f.write(response.content)
+            digest = hashlib.sha256()
+            with response, open(temp_file, 'wb') as f:
+                response.raw.decode_content = True
+                for chunk in iter(lambda: response.raw.read(1 << 16), b''):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    
+            return self._finish_download(filename, url, temp_file, digest.hexdigest(), response.headers)
             
-            # 检查并处理Base64编码内容
-            import base64
-            import re
+        except Exception as e:
+            self.logger.error(f"下载订阅时发生错误 {filename}: {str(e)}")
+            return False
             
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+    def _finish_download(self, filename: str, url: str, temp_file: Path,
+                         sha256: str, response_headers: Mapping[str, str]) -> bool:
+        """
+        完成一次200响应的下载：内容哈希未变化时直接复用已有文件，否则重新处理，并更新缓存
+        
+        Args:
+            filename: 保存的文件名
+            url: 订阅URL
+            temp_file: 已写入响应体的临时文件
+            sha256: 响应体的SHA-256
+            response_headers: 响应头（用于记录ETag/Last-Modified）
             
-            # 检查是否为Base64编码
-            base64_pattern = r'^[a-zA-Z0-9+/]{50,}(={0,2})?$'
-            if re.match(base64_pattern, content.strip()) and len(content.strip()) > 100:
-                self.logger.info(f"检测到Base64编码，正在解码: {filename}")
-                try:
-                    decoded_bytes = base64.b64decode(content.strip())
-                    content = decoded_bytes.decode('utf-8')
-                    self.logger.info(f"Base64解码成功，原始大小: {len(decoded_bytes)} 字节")
-                    
-                    # 重新写入解码后的内容
-                    with open(temp_file, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                except Exception as decode_error:
-                    self.logger.error(f"Base64解码失败: {str(decode_error)}")
-                    temp_file.unlink(missing_ok=True)
-                    return False
+        Returns:
+            bool: 处理是否成功
+        """
+        entry = self._reusable_entry(filename, url)
+        if entry and entry.get('sha256') == sha256:
+            temp_file.unlink(missing_ok=True)
+            self.logger.info(f"订阅内容未变化，复用已有文件: {filename}")
+            success = True
+        else:
+            success = self._process_download(filename, temp_file)
             
-            # 检查是否为URI格式（trojan://, vless://等）
-            from urllib.parse import urlparse, parse_qs, unquote
-            import json
+        if success:
+            with self._cache_lock:
+                self._cache[filename] = {
+                    'url': url,
+                    'etag': response_headers.get('ETag'),
+                    'last_modified': response_headers.get('Last-Modified'),
+                    'sha256': sha256,
+                    'mtime': time.time(),
+                    'version': self.PROCESS_VERSION
+                }
+                self._save_cache()
+            
+        return success
+        
+    def _use_cached_file(self, filename: str) -> bool:
+        """
+        服务器返回304时复用本地已下载的文件
+        
+        Args:
+            filename: 保存的文件名
+            
+        Returns:
+            bool: 始终返回True
+        """
+        self.logger.info(f"订阅未修改(304)，复用已有文件: {filename}")
+        return True
+        
+    def _conditional_headers(self, filename: str, url: str) -> Dict[str, str]:
+        """
+        根据下载缓存生成条件请求头（If-None-Match / If-Modified-Since）
+        
+        Args:
+            filename: 保存的文件名
+            url: 订阅URL
+            
+        Returns:
+            Dict[str, str]: 条件请求头，没有可用缓存时为空
+        """
+        headers = {}
+        entry = self._reusable_entry(filename, url)
+        if not entry:
+            return headers
+            
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+        
+    def _reusable_entry(self, filename: str, url: str) -> Optional[Dict[str, Any]]:
+        """
+        查找可复用的下载缓存项：URL和处理版本都一致且已转换的文件仍然存在
+        
+        Args:
+            filename: 保存的文件名
+            url: 订阅URL
+            
+        Returns:
+            Dict[str, Any]: 缓存项，不能复用时返回None
+        """
+        entry = self._cache.get(filename)
+        if (not entry or entry.get('url') != url or entry.get('version') != self.PROCESS_VERSION
+                or not (self.download_dir / filename).exists()):
+            return None
+        return entry
+        
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """
+        读取下载缓存文件
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: 下载缓存，文件不存在或损坏时为空
+        """
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"读取下载缓存失败，将重新下载: {str(e)}")
+            return {}
+            
+    def _save_cache(self):
+        """保存下载缓存文件（先写临时文件再替换，避免中断导致缓存损坏）"""
+        try:
+            temp_cache = self.cache_file.with_suffix('.tmp')
+            with open(temp_cache, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f, ensure_ascii=False, indent=2)
+            temp_cache.replace(self.cache_file)
+        except Exception as e:
+            self.logger.warning(f"保存下载缓存失败: {str(e)}")
+            
+    def _process_download(self, filename: str, temp_file: Path) -> bool:
+        """
+        处理已下载到临时文件的订阅内容：Base64解码、URI转换、验证后移动到下载目录
+        
+        Args:
+            filename: 保存的文件名
+            temp_file: 临时文件路径
+            
+        Returns:
+            bool: 处理是否成功
+        """
+        output_file = self.download_dir / filename
+        
+        try:
+            # 检查并处理Base64编码内容
+            # 以只读mmap扫描临时文件，Base64检测与解码直接作用于映射内存，不再先整体读入
+            is_base64 = False
+            with open(temp_file, 'rb') as f:
+                head = f.read(512)
+                if not head or head.lstrip().startswith(_PLAIN_YAML_PREFIXES):
+                    # 空文件或开头即为普通YAML配置：跳过解码与URI扫描，直接验证后移动
+                    content = ''
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        is_base64 = looks_like_base64(mm)
+                        if is_base64:
+                            self.logger.info(f"检测到Base64编码，正在解码: {filename}")
+                            try:
+                                decoded = base64.b64decode(mm)
+                                content = decoded.decode('utf-8')
+                                self.logger.info(f"Base64解码成功，原始大小: {len(decoded)} 字节")
+                            except Exception as decode_error:
+                                self.logger.error(f"Base64解码失败: {str(decode_error)}")
+                                content = None
+                        else:
+                            content = str(mm, 'utf-8')
+                            
+            if content is None:
+                temp_file.unlink(missing_ok=True)
+                return False
             
+            # 检查是否为URI格式（trojan://, vless://等）
             uri_proxies = []
-            for line in content.strip().split('\n'):
+            # 逐行惰性迭代，不再先strip整个内容再切分出全部行的列表
+            for line in io.StringIO(content):
                 line = line.strip()
                 if not line or line.startswith('#'):
                     continue
@@ -123,223 +786,59 @@ class HTTPDownloader:
                         else:
                             proxy_name = f"Proxy_{len(uri_proxies) + 1}"
                         
-                        # 解析协议和参数
-                        if uri.startswith('trojan://'):
-                            protocol = 'trojan'
-                            uri = uri[9:]  # 移除 'trojan://'
-                        elif uri.startswith('ss://'):
-                            protocol = 'ss'
-                            uri = uri[5:]  # 移除 'ss://'
-                        elif uri.startswith('vless://'):
-                            protocol = 'vless'
-                            uri = uri[8:]  # 移除 'vless://'
-                        elif uri.startswith('vmess://'):
-                            protocol = 'vmess'
-                            # 解析VMess
-                            import base64 as b64
-                            json_str = b64.b64decode(uri[8:]).decode('utf-8')
-                            vmess_config = json.loads(json_str)
-                            
-                            proxy = {
-                                'name': proxy_name,
-                                'type': 'vmess',
-                                'server': vmess_config.get('add', vmess_config.get('address', '')),
-                                'port': int(vmess_config.get('port', 443)),
-                                'uuid': vmess_config.get('id', ''),
-                                'alterId': vmess_config.get('aid', 0),
-                                'cipher': vmess_config.get('scy', 'auto'),
-                                'network': vmess_config.get('net', 'tcp'),
-                            }
-                            
-                            if vmess_config.get('tls') == 'tls':
-                                proxy['tls'] = True
-                            if vmess_config.get('sni'):
-                                proxy['sni'] = vmess_config.get('sni')
+                        # 按协议名查表分派解析函数，不支持的协议直接跳过
+                        scheme, _, rest = uri.partition('://')
+                        parser = _SCHEME_PARSERS.get(scheme)
+                        if parser is None:
+                            continue
                             
+                        proxy = parser(rest, proxy_name)
+                        if proxy:
                             uri_proxies.append(proxy)
-                            continue
-                        elif uri.startswith('hysteria2://'):
-                            protocol = 'hysteria2'
-                            uri = uri[12:]  # 移除 'hysteria2://'
-                        else:
-                            continue
-                        
-                        # 解析服务器和端口
-                        if '@' in uri:
-                            userinfo, server_part = uri.split('@', 1)
-                        else:
-                            userinfo = None
-                            server_part = uri
-                        
-                        if '?' in server_part:
-                            server_addr, query = server_part.split('?', 1)
-                        else:
-                            server_addr = server_part
-                            query = ''
-                        
-                        # 清理server_addr末尾的斜杠（处理 /? 的情况）
-                        server_addr = server_addr.rstrip('/')
-                        
-                        if ':' in server_addr:
-                            server, port = server_addr.rsplit(':', 1)
-                        else:
-                            continue
-                        
-                        # 解析参数
-                        params = {}
-                        for param in query.split('&'):
-                            if '=' in param:
-                                key, value = param.split('=', 1)
-                                params[key] = unquote(value)
-                        
-                        # 构建代理配置
-                        proxy = {
-                            'name': proxy_name,
-                            'type': protocol,
-                            'server': server,
-                            'port': int(port),
-                        }
-                        
-                        if userinfo:
-                            if ':' in userinfo:
-                                if protocol == 'trojan':
-                                    proxy['password'] = userinfo
-                                elif protocol == 'ss':
-                                    password_idx = userinfo.rfind(':')
-                                    if password_idx != -1:
-                                        proxy['method'] = userinfo[:password_idx]
-                                        proxy['password'] = userinfo[password_idx+1:]
-                                elif protocol == 'vless':
-                                    # vless格式可能是 UUID:flow 或 UUID
-                                    parts = userinfo.split(':', 1)
-                                    proxy['uuid'] = parts[0]
-                                    if len(parts) > 1 and parts[1]:
-                                        proxy['flow'] = parts[1]
-                            else:
-                                # 对于trojan/vless/vmess协议，userinfo就是对应的认证信息
-                                if protocol == 'trojan':
-                                    proxy['password'] = userinfo
-                                elif protocol == 'vless':
-                                    proxy['uuid'] = userinfo
-                                elif protocol == 'vmess':
-                                    proxy['uuid'] = userinfo
-                        
-                        # vless/vmess协议添加alterId和cipher默认值
-                        if protocol == 'vless':
-                            if 'alterId' not in proxy:
-                                proxy['alterId'] = 0
-                            if 'cipher' not in proxy:
-                                proxy['cipher'] = 'auto'
-                        
-                        # 添加其他参数
-                        if 'sni' in params:
-                            proxy['sni'] = params['sni']
-                        if 'servername' in params:
-                            proxy['servername'] = params['servername']
-                        if 'skip-cert-verify' in params:
-                            proxy['skip-cert-verify'] = params['skip-cert-verify'] == '1'
-                        if 'allowinsecure' in params:
-                            proxy['skip-cert-verify'] = params['allowinsecure'] == '1'
-                        if 'allowInsecure' in params:
-                            proxy['skip-cert-verify'] = params['allowInsecure'] == '1'
-                        if 'insecure' in params:
-                            proxy['skip-cert-verify'] = params['insecure'] == '1'
-                        if 'udp' in params:
-                            proxy['udp'] = params['udp'] == '1'
-                        if 'type' in params:
-                            proxy['network'] = params['type']
-                        
-                        # TLS/Reality启用 (支持多种参数名)
-                        if params.get('tls') == '1' or params.get('security') == 'tls':
-                            proxy['tls'] = True
-                        
-                        # flow参数（支持flow=xxx格式）
-                        if 'flow' in params:
-                            proxy['flow'] = params['flow']
-                        
-                        # encryption参数
-                        if 'encryption' in params:
-                            proxy['cipher'] = params['encryption']
-                        
-                        # client-fingerprint参数
-                        if 'fp' in params:
-                            proxy['client-fingerprint'] = params['fp']
-                        elif 'client-fingerprint' in params:
-                            proxy['client-fingerprint'] = params['client-fingerprint']
-                        
-                        # WebSocket相关参数
-                        if 'path' in params:
-                            ws_opts = {'path': params['path']}
-                            if 'host' in params:
-                                ws_opts['headers'] = {'Host': params['host']}
-                            # early-data相关参数
-                            if 'ed' in params:
-                                ws_opts['max-early-data'] = int(params['ed'])
-                            if 'ecdh' in params:
-                                ws_opts['early-data-header-name'] = params['ecdh']
-                            proxy['ws-opts'] = ws_opts
-                        
-                        # Reality相关参数
-                        if 'pbk' in params:
-                            reality_opts = {'public-key': params['pbk']}
-                            if 'sid' in params:
-                                reality_opts['short-id'] = params['sid']
-                            proxy['reality-opts'] = reality_opts
-                        
-                        # hysteria2特殊参数
-                        if protocol == 'hysteria2':
-                            if 'mport' in params:
-                                proxy['mport'] = params['mport']
-                            if 'ports' in params:
-                                proxy['ports'] = params['ports']
-                            # hysteria2默认开启udp
-                            if 'udp' not in proxy:
-                                proxy['udp'] = True
-                        
-                        # Trojan/Ws的默认参数
-                        if protocol == 'trojan':
-                            if 'password' not in proxy and 'userinfo' in dir():
-                                # 如果userinfo没有:分隔，整个就是password
-                                pass  # 已在上面处理
-                        
-                        uri_proxies.append(proxy)
                         
                     except Exception as e:
                         self.logger.warning(f"解析URI失败: {line[:50]}... 错误: {str(e)}")
                         continue
             
-            # 如果包含URI代理，生成YAML格式
+            # 最终内容：包含URI代理时为生成的YAML，Base64订阅为解码结果，否则临时文件即最终内容
             if uri_proxies:
                 self.logger.info(f"检测到 {len(uri_proxies)} 个URI格式代理，正在转换为YAML格式")
                 
-                # 生成YAML内容
-                yaml_content = "mixed-port: 7890\nallow-lan: true\nbind-address: '*'\nmode: rule\nlog-level: info\nexternal-controller: '127.0.0.1:9090'\ndns:\n    enable: false\n    ipv6: false\n    default-nameserver: [223.5.5.5, 119.29.29.29]\n    enhanced-mode: fake-ip\n    fake-ip-range: 198.18.0.1/16\n    use-hosts: true\n    nameserver: ['https://doh.pub/dns-query', 'https://dns.alidns.com/dns-query']\n    fallback: ['https://doh.dns.sb/dns-query', 'https://dns.cloudflare.com/dns-query', 'https://dns.twnic.tw/dns-query', 'tls://8.8.4.4:853']\n    fallback-filter: { geoip: true, ipcidr: [240.0.0.0/4, 0.0.0.0/32] }\nproxies:\n"
-                
-                for proxy in uri_proxies:
-                    proxy_json = json.dumps(proxy, ensure_ascii=False, separators=(',', ':'))
-                    yaml_content += f"  - {proxy_json}\n"
-                
-                # 重新写入YAML格式内容
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    f.write(yaml_content)
+                # 生成YAML内容：由YAML输出器负责转义，节点名含#、*等字符时也能正确表示
+                document = dict(_URI_BASE_CONFIG, proxies=uri_proxies)
+                data = yaml.dump(document, Dumper=SafeDumper, allow_unicode=True, sort_keys=False,
+                                 default_flow_style=None, width=4096, encoding='utf-8')
                     
                 self.logger.info(f"URI到YAML转换完成")
+            elif is_base64:
+                data = decoded
+            else:
+                data = None
             
-            # 验证下载内容
-            if not self._validate_content(temp_file):
+            # 验证下载内容（内容已在内存中时直接检查开头，不再写入后重新读取）
+            if data is None:
+                valid = self._validate_content(temp_file)
+            else:
+                valid = _check_payload_head(data[:4096].decode('utf-8', 'ignore')[:1024])
+            if not valid:
                 self.logger.error(f"下载的文件内容无效: {filename}")
                 temp_file.unlink(missing_ok=True)
                 return False
                 
-            # 移动到目标位置
-            temp_file.replace(output_file)
-            
-            file_size = output_file.stat().st_size
+            # 移动到目标位置；内容有变化时一次性原子写入，不再反复改写临时文件
+            if data is None:
+                temp_file.replace(output_file)
+                file_size = output_file.stat().st_size
+            else:
+                _write_atomic(output_file, data)
+                temp_file.unlink(missing_ok=True)
+                file_size = len(data)
             self.logger.info(f"下载完成: {filename} ({file_size} 字节)")
             return True
             
         except Exception as e:
-            self.logger.error(f"下载订阅时发生错误 {filename}: {str(e)}")
+            self.logger.error(f"处理订阅内容时发生错误 {filename}: {str(e)}")
+            temp_file.unlink(missing_ok=True)
             return False
             
     def _validate_url(self, url: str) -> bool:
@@ -353,41 +852,32 @@ class HTTPDownloader:
             bool: URL是否有效
         """
         try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
+            result = _parse_url(url)
+            return bool(result.scheme) and bool(result.netloc)
         except Exception:
             return False
             
-    def _make_request(self, url: str) -> Optional[requests.Response]:
+    def _make_request(self, url: str,
+                      headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
         """
         发送HTTP请求
         
         Args:
             url: 请求URL
+            headers: 额外的请求头（如条件请求头）
             
         Returns:
             requests.Response: HTTP响应对象，失败时返回None
         """
         try:
-            session = requests.Session()
-            
-            # 设置重试策略
-            retry_strategy = Retry(
-                total=3,
-                backoff_factor=1,
-                status_forcelist=[429, 500, 502, 503, 504],
-            )
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
-            
-            # 发送请求
-            response = session.get(
+            # 发送请求（以流模式返回，由调用方读取响应体）
+            response = self._session.get(
                 url,
-                headers=self.headers,
+                headers=headers,
                 timeout=self.timeout,
                 allow_redirects=True,
-                verify=True  # 验证SSL证书
+                verify=True,  # 验证SSL证书
+                stream=True
             )
             
             response.raise_for_status()
@@ -398,6 +888,7 @@ class HTTPDownloader:
         except requests.exceptions.ConnectionError:
             self.logger.error(f"连接错误: {url}")
         except requests.exceptions.HTTPError as e:
+            e.response.close()
             self.logger.error(f"HTTP错误 {e.response.status_code}: {url}")
         except requests.exceptions.RequestException as e:
             self.logger.error(f"请求异常: {url} - {str(e)}")
@@ -417,25 +908,10 @@ class HTTPDownloader:
             bool: 内容是否有效
         """
         try:
-            # 检查文件大小
-            if file_path.stat().st_size == 0:
-                self.logger.error("下载的文件为空")
-                return False
-                
-            # 检查是否为YAML格式
+            # 检查是否为YAML格式（读取结果为空即文件为空，无需额外stat）
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read(1024)  # 读取前1024字符
+                return _check_payload_head(f.read(1024))  # 读取前1024字符
                 
-                # 检查是否包含YAML关键字
-                yaml_keywords = ['proxies:', 'proxy-groups:', 'rules:', 'mixed-port:', 'mode:']
-                has_yaml_content = any(keyword in content for keyword in yaml_keywords)
-                
-                if not has_yaml_content:
-                    self.logger.error("文件内容不是有效的YAML格式")
-                    return False
-                    
-            return True
-            
         except Exception as e:
             self.logger.error(f"验证文件内容时发生错误: {str(e)}")
             return False
@@ -457,8 +933,7 @@ class HTTPDownloader:
             output_file = self.download_dir / filename
             temp_file = self.temp_dir / f"{filename}.tmp"
             
-            with requests.get(url, headers=self.headers, 
-                            timeout=self.timeout, stream=True) as response:
+            with self._session.get(url, timeout=self.timeout, stream=True) as response:
                 response.raise_for_status()
                 
                 total_size = int(response.headers.get('content-length', 0))
@@ -498,7 +973,7 @@ class HTTPDownloader:
             Dict[str, Any]: 文件信息，失败时返回None
         """
         try:
-            response = requests.head(url, headers=self.headers, timeout=self.timeout)
+            response = self._session.head(url, timeout=self.timeout)
             response.raise_for_status()
             
             return {
@@ -513,12 +988,21 @@ class HTTPDownloader:
             self.logger.error(f"获取文件信息时发生错误 {url}: {str(e)}")
             return None
             
+    def close(self):
+        """关闭HTTP会话，释放连接池中的keep-alive连接"""
+        self._session.close()
+        
     def cleanup(self):
-        """清理临时文件"""
+        """清理临时文件并关闭HTTP会话"""
+        self.close()
         try:
-            for temp_file in self.temp_dir.glob("*.tmp"):
-                temp_file.unlink(missing_ok=True)
-                self.logger.debug(f"清理临时文件: {temp_file}")
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.tmp'):
+                        Path(entry.path).unlink(missing_ok=True)
+                        self.logger.debug(f"清理临时文件: {entry.path}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             self.logger.error(f"清理临时文件时发生错误: {str(e)}")
             
@@ -531,19 +1015,25 @@ class HTTPDownloader:
         """
         stats = {
             'download_dir': str(self.download_dir),
-            'dir_exists': self.download_dir.exists(),
+            'dir_exists': True,
             'downloaded_files': [],
             'total_size': 0
         }
         
-        if self.download_dir.exists():
-            for file_path in self.download_dir.glob("*.yaml"):
-                file_size = file_path.stat().st_size
-                stats['downloaded_files'].append({
-                    'name': file_path.name,
-                    'size': file_size,
-                    'modified': file_path.stat().st_mtime
-                })
-                stats['total_size'] += file_size
+        # scandir的目录项自带文件类型，每个文件只需一次stat
+        try:
+            with os.scandir(self.download_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.yaml') or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    stats['downloaded_files'].append({
+                        'name': entry.name,
+                        'size': st.st_size,
+                        'modified': st.st_mtime
+                    })
+                    stats['total_size'] += st.st_size
+        except FileNotFoundError:
+            stats['dir_exists'] = False
                 
         return stats
\ No newline at end of file
@@ -3,17 +3,101 @@ YAML处理器模块
 负责解析YAML格式的Clash配置文件，提取代理节点信息
 """
 
-import re
+import os
+import mmap
+import base64
+import string
 import logging
 import yaml
 import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple, Union
+
+# 优先使用基于libyaml的C解析器，未编译libyaml时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as SafeLoader
+    YAML_BACKEND = 'libyaml'
+except ImportError:
+    from yaml import SafeLoader
+    YAML_BACKEND = 'pure-python'
+    # 模块只导入一次，警告也只输出一次
+    logging.getLogger(__name__).warning(
+        "PyYAML未编译libyaml，将使用纯Python解析器，大型订阅解析会明显变慢；"
+        "建议安装libyaml后重新安装PyYAML"
+    )
+
+
+class _FastLoader(SafeLoader):
+    """订阅解析专用Loader，进程内只创建一次，所有解析调用共用"""
+
+
+# 代理配置只用到str/int/float/bool/null，去掉时间戳的隐式解析，
+# 省去每个标量的时间戳正则匹配，也避免把形如日期的节点名解析成date对象
+_FastLoader.yaml_implicit_resolvers = {
+    first_char: [resolver for resolver in resolvers if resolver[0] != 'tag:yaml.org,2002:timestamp']
+    for first_char, resolvers in SafeLoader.yaml_implicit_resolvers.items()
+}
+
+
+# Base64订阅内容中允许出现的字节（字母数字、+/=及换行空白），translate删除后应无剩余
+_BASE64_BYTES = (string.ascii_letters + string.digits + '+/=\r\n\t ').encode('ascii')
+# Base64嗅探只检查首尾各这么多字节
+_BASE64_SNIFF_SIZE = 4096
+
+
+# 有效代理配置必须包含的字段
+_REQUIRED_PROXY_FIELDS = frozenset(('name', 'type', 'server', 'port'))
+
+
+def looks_like_base64(content: Union[bytes, mmap.mmap]) -> bool:
+    """
+    判断订阅内容是否整体为Base64编码。只检查首尾各4KB，
+    用bytes.translate删除Base64字符后看是否有剩余，不对全文做正则扫描
+    
+    Args:
+        content: 订阅原始内容（字节串或只读mmap）
+        
+    Returns:
+        bool: 是否像Base64编码的内容
+    """
+    if len(content) <= 100:
+        return False
+    head = content[:_BASE64_SNIFF_SIZE]
+    tail = content[-_BASE64_SNIFF_SIZE:]
+    return (bool(head.strip())
+            and not head.translate(None, _BASE64_BYTES)
+            and not tail.translate(None, _BASE64_BYTES))
+
+
+def proxy_identity(proxy: Dict[str, Any]) -> Tuple:
+    """
+    计算代理节点的身份键：服务器、端口、类型、认证信息和传输方式都相同即视为同一节点
+    
+    Args:
+        proxy: 代理配置
+        
+    Returns:
+        Tuple: 可哈希的身份键
+    """
+    key = (
+        proxy.get('server'),
+        proxy.get('port'),
+        proxy.get('type'),
+        proxy.get('uuid') or proxy.get('password'),
+        proxy.get('network'),
+    )
+    # 个别订阅会把这些字段写成列表/字典，转成字符串保证可哈希
+    return tuple(v if isinstance(v, (str, int, float, type(None))) else repr(v) for v in key)
 
 
 class YAMLProcessor:
     """YAML文件处理器"""
     
+    # 解析结果缓存目录（位于订阅文件所在目录下）
+    PARSED_CACHE_DIR = ".parsed"
+    # 解析缓存格式版本：修改解析、标准化或校验逻辑后须递增，使旧的缓存全部失效
+    PARSED_CACHE_VERSION = 2
+    
     def __init__(self):
         """初始化YAML处理器"""
         self.logger = logging.getLogger(__name__)
@@ -35,79 +119,198 @@ class YAMLProcessor:
             List[Dict[str, Any]]: 代理配置列表
         """
         try:
-            self.logger.debug(f"开始解析YAML文件: {yaml_file}")
-            
-            # 读取YAML文件
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                
-            # 检查是否为Base64编码
-            import base64
-            import re
-            
-            # Base64模式：以特定字符串开头，包含大量字母数字和+/字符，长度较长
-            base64_pattern = r'^[a-zA-Z0-9+/]{50,}(={0,2})?$'
-            if re.match(base64_pattern, content) and len(content) > 100:
-                self.logger.info(f"检测到Base64编码，正在解码: {yaml_file}")
-                try:
-                    # 尝试解码Base64
-                    decoded_bytes = base64.b64decode(content)
-                    content = decoded_bytes.decode('utf-8')
-                    self.logger.info(f"Base64解码成功，原始大小: {len(decoded_bytes)} 字节")
-                    
-                    # 保存解码后的内容到同名文件（添加.decoded标记）
-                    decoded_file = yaml_file.parent / (yaml_file.stem + '.decoded' + yaml_file.suffix)
-                    with open(decoded_file, 'w', encoding='utf-8') as df:
-                        df.write(content)
-                    self.logger.info(f"已保存解码后的YAML文件: {decoded_file}")
-                except Exception as decode_error:
-                    self.logger.error(f"Base64解码失败: {str(decode_error)}")
-                    return []
-            
-            # 解析YAML内容
-            yaml_data = self._parse_yaml_content(content)
-            if not yaml_data:
-                self.logger.warning(f"YAML文件解析失败或为空: {yaml_file}")
-                return []
-                
-            # 提取proxies部分
-            proxies = yaml_data.get('proxies', [])
-            if not proxies:
-                self.logger.warning(f"文件中没有找到proxies配置: {yaml_file}")
-                return []
+            # 文件内容未变化时直接使用上次的解析结果
+            cache_file = self._parsed_cache_path(yaml_file)
+            processed_proxies = self._load_parsed_cache(cache_file)
+            if processed_proxies is not None:
+                self.logger.info(f"从 {yaml_file.name} 读取了 {len(processed_proxies)} 个有效代理（解析缓存）")
+                return processed_proxies
                 
-            # 处理不同格式的代理配置
-            processed_proxies = []
-            for i, proxy in enumerate(proxies):
-                try:
-                    processed_proxy = self._process_proxy_config(proxy, i)
-                    if processed_proxy and self._validate_proxy(processed_proxy):
-                        processed_proxies.append(processed_proxy)
-                    else:
-                        self.logger.warning(f"跳过无效的代理配置 #{i+1}")
-                except Exception as e:
-                    self.logger.warning(f"处理代理配置 #{i+1} 时发生错误: {str(e)}")
-                    
+            processed_proxies = list(self.iter_proxies(yaml_file))
             self.logger.info(f"从 {yaml_file.name} 提取了 {len(processed_proxies)} 个有效代理")
+            self._save_parsed_cache(cache_file, processed_proxies)
             return processed_proxies
             
         except Exception as e:
             self.logger.error(f"提取代理配置时发生错误 {yaml_file}: {str(e)}")
             return []
             
-    def _parse_yaml_content(self, content: str) -> Optional[Dict[str, Any]]:
+    def has_parsed_cache(self, yaml_file: Path) -> bool:
+        """
+        检查文件当前内容是否已有解析缓存（只stat，不读取缓存内容）
+        
+        Args:
+            yaml_file: YAML文件路径
+            
+        Returns:
+            bool: 是否存在解析缓存
+        """
+        try:
+            return self._parsed_cache_path(yaml_file).exists()
+        except OSError:
+            return False
+            
+    def _parsed_cache_path(self, yaml_file: Path) -> Path:
+        """
+        计算解析缓存文件路径，按缓存版本、文件名、文件大小和修改时间区分。
+        下载器每次更新订阅都会替换文件，只需一次stat，无需重新读取并哈希全文
+        
+        Args:
+            yaml_file: YAML文件路径
+            
+        Returns:
+            Path: 缓存文件路径（位于同目录的.parsed子目录）
+        """
+        st = yaml_file.stat()
+        key = f"v{self.PARSED_CACHE_VERSION}-{st.st_size}-{st.st_mtime_ns}"
+        return yaml_file.parent / self.PARSED_CACHE_DIR / f"{yaml_file.name}.{key}.json"
+        
+    def _load_parsed_cache(self, cache_file: Path) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取解析缓存
+        
+        Args:
+            cache_file: 缓存文件路径
+            
+        Returns:
+            List[Dict[str, Any]]: 缓存的代理配置列表，未命中时返回None
+        """
+        try:
+            # 缓存以JSON保存，读取时不会像pickle那样执行缓存文件中的任意代码
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                proxies = json.load(f)
+            return proxies if isinstance(proxies, list) else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.debug(f"读取解析缓存失败 {cache_file}: {str(e)}")
+            return None
+            
+    def _save_parsed_cache(self, cache_file: Path, proxies: List[Dict[str, Any]]):
+        """
+        保存解析缓存，并清理同一文件旧内容对应的缓存
+        
+        Args:
+            cache_file: 缓存文件路径
+            proxies: 代理配置列表
+        """
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            yaml_name = cache_file.name.rsplit('.', 2)[0]
+            # 同时清理旧版本留下的.pkl缓存
+            for pattern in (f"{yaml_name}.v*-*-*.json", f"{yaml_name}.*.pkl"):
+                for stale in cache_file.parent.glob(pattern):
+                    if stale != cache_file:
+                        stale.unlink(missing_ok=True)
+                    
+            # 先完整序列化再写入，含无法序列化的值时不会留下写了一半的缓存
+            data = json.dumps(proxies, ensure_ascii=False, separators=(',', ':'))
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except Exception as e:
+            self.logger.debug(f"保存解析缓存失败 {cache_file}: {str(e)}")
+            
+    def iter_proxies(self, yaml_file: Path) -> Iterator[Dict[str, Any]]:
+        """
+        逐个产出YAML文件中的有效代理配置，供流式处理使用
+        
+        Args:
+            yaml_file: YAML文件路径
+            
+        Yields:
+            Dict[str, Any]: 通过校验的代理配置
+        """
+        self.logger.debug(f"开始解析YAML文件: {yaml_file}")
+        
+        # 解析YAML内容
+        yaml_data = self._load_yaml_file(yaml_file)
+        if not yaml_data:
+            self.logger.warning(f"YAML文件解析失败或为空: {yaml_file}")
+            return
+            
+        # 提取proxies部分
+        proxies = yaml_data.get('proxies', [])
+        if not proxies:
+            self.logger.warning(f"文件中没有找到proxies配置: {yaml_file}")
+            return
+            
+        # 处理不同格式的代理配置
+        for i, proxy in enumerate(proxies):
+            try:
+                processed_proxy = self._process_proxy_config(proxy, i)
+                valid = bool(processed_proxy) and self._validate_proxy(processed_proxy)
+            except Exception as e:
+                self.logger.warning(f"处理代理配置 #{i+1} 时发生错误: {str(e)}")
+                continue
+                
+            if valid:
+                yield processed_proxy
+            else:
+                self.logger.warning(f"跳过无效的代理配置 #{i+1}")
+                
+    def _load_yaml_file(self, yaml_file: Path) -> Optional[Dict[str, Any]]:
+        """
+        读取并解析YAML文件。文件通过mmap映射后直接交给libyaml，
+        不再把完整内容读入Python字节串；Base64编码的订阅先解码再解析
+        
+        Args:
+            yaml_file: YAML文件路径
+            
+        Returns:
+            Dict[str, Any]: 解析后的数据，文件为空或解析失败时返回None
+        """
+        with open(yaml_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+                
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                if looks_like_base64(content):
+                    decoded = self._decode_base64_file(yaml_file, content)
+                    return self._parse_yaml_content(decoded) if decoded is not None else None
+                    
+                return self._parse_yaml_content(content)
+                
+    def _decode_base64_file(self, yaml_file: Path, content: bytes) -> Optional[bytes]:
+        """
+        解码Base64编码的订阅内容，并保存解码结果到同名.decoded文件
+        
+        Args:
+            yaml_file: YAML文件路径
+            content: 文件原始内容
+            
+        Returns:
+            bytes: 解码后的YAML内容，失败时返回None
+        """
+        self.logger.info(f"检测到Base64编码，正在解码: {yaml_file}")
+        try:
+            # 尝试解码Base64（非严格模式会跳过换行等空白字符）
+            decoded = base64.b64decode(content)
+            decoded.decode('utf-8')  # 确认解码结果为合法UTF-8文本
+            self.logger.info(f"Base64解码成功，原始大小: {len(decoded)} 字节")
+            
+            # 保存解码后的内容到同名文件（添加.decoded标记）
+            decoded_file = yaml_file.parent / (yaml_file.stem + '.decoded' + yaml_file.suffix)
+            with open(decoded_file, 'wb') as df:
+                df.write(decoded)
+            self.logger.info(f"已保存解码后的YAML文件: {decoded_file}")
+            return decoded
+        except Exception as decode_error:
+            self.logger.error(f"Base64解码失败: {str(decode_error)}")
+            return None
+            
+    def _parse_yaml_content(self, content: Union[str, bytes, mmap.mmap]) -> Optional[Dict[str, Any]]:
         """
         解析YAML内容
         
         Args:
-            content: YAML文本内容
+            content: YAML文本内容（str、UTF-8字节或只读mmap）
             
         Returns:
             Dict[str, Any]: 解析后的数据，失败时返回None
         """
         try:
-            # 尝试使用PyYAML解析
-            data = yaml.safe_load(content)
+            # 使用SafeLoader解析（优先libyaml C实现）
+            data = yaml.load(content, Loader=_FastLoader)
             return data
             
         except yaml.YAMLError as e:
@@ -144,8 +347,12 @@ class YAMLProcessor:
             proxy: 原始代理配置
             
         Returns:
-            Dict[str, Any]: 标准化后的代理配置
+            Dict[str, Any]: 标准化后的代理配置（无需补充字段时即原字典）
         """
+        # 绝大多数节点已包含name和type，直接返回，不复制字典
+        if 'name' in proxy and 'type' in proxy:
+            return proxy
+            
         normalized = proxy.copy()
         
         # 确保有name字段
@@ -182,9 +389,8 @@ class YAMLProcessor:
                 
             # 尝试解析为YAML单行格式
             if ':' in proxy_str:
-                import yaml
                 try:
-                    return yaml.safe_load(f"- {proxy_str}")
+                    return yaml.load(f"- {proxy_str}", Loader=_FastLoader)
                 except:
                     pass
                     
@@ -203,20 +409,45 @@ class YAMLProcessor:
         Returns:
             bool: 是否有效
         """
-        # 检查必需字段
-        if 'name' not in proxy or not proxy['name']:
-            return False
-            
-        if 'type' not in proxy:
-            return False
-            
-        if 'server' not in proxy or not proxy['server']:
-            return False
+        # 检查必需字段：一次集合包含判断，name和server还不能为空
+        return _REQUIRED_PROXY_FIELDS <= proxy.keys() and bool(proxy['name']) and bool(proxy['server'])
+        
+    def deduplicate_proxies(self, proxies: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        按身份键去除重复的代理节点（哈希集合，O(N)），保留首次出现的节点
+        
+        Args:
+            proxies: 代理配置
             
-        if 'port' not in proxy:
-            return False
+        Returns:
+            List[Dict[str, Any]]: 去重后的代理配置列表
+        """
+        unique_proxies = []
+        self.merge_unique_proxies(unique_proxies, proxies, set())
+        return unique_proxies
+        
+    def merge_unique_proxies(self, merged: List[Dict[str, Any]], proxies: Iterable[Dict[str, Any]],
+                             seen: Set[Tuple]) -> int:
+        """
+        把尚未出现过的代理节点追加到已合并列表，用于逐个订阅增量合并并去重
+        
+        Args:
+            merged: 已合并的代理列表（原地追加）
+            proxies: 待合并的代理配置
+            seen: 已合并节点的身份键集合（原地更新）
             
-        return True
+        Returns:
+            int: 新增的节点数量
+        """
+        added = 0
+        for proxy in proxies:
+            key = proxy_identity(proxy)
+            if key not in seen:
+                seen.add(key)
+                merged.append(proxy)
+                added += 1
+                
+        return added
         
     def get_proxy_names(self, yaml_file: Path) -> List[str]:
         """
@@ -228,5 +459,8 @@ class YAMLProcessor:
         Returns:
             List[str]: 代理名称列表
         """
-        proxies = self.extract_proxies(yaml_file)
-        return [proxy.get('name', 'Unknown') for proxy in proxies]
\ No newline at end of file
+        try:
+            return [proxy.get('name', 'Unknown') for proxy in self.iter_proxies(yaml_file)]
+        except Exception as e:
+            self.logger.error(f"获取代理名称时发生错误 {yaml_file}: {str(e)}")
+            return []
\ No newline at end of file